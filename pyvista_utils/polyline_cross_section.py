@@ -2,6 +2,7 @@
 """Extrude a profile along a polyline."""
 
 # Import python modules
+import numpy as np
 import pyvista as pv
 
 # Import local stuff
@@ -55,7 +56,7 @@ def polyline_cross_section(
             n_surfaces = len(cross_section_points) - 1
         n_cells = grid_surfaces.n_cells
         surfaces = [
-            grid_surfaces.extract_cells(range(i_start, n_cells, n_surfaces))
+            grid_surfaces.extract_cells(np.arange(i_start, n_cells, n_surfaces))
             for i_start in range(n_surfaces)
         ]
 
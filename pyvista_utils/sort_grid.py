@@ -4,10 +4,7 @@
 # Import python modules.
 import pyvista as pv
 import numpy as np
-import vtk
-
-# Import local stuff
-from vtk_utils.vtk_data_structures_utils import vtk_id_to_list
+from vtk.util import numpy_support as vtk_numpy_support
 
 
 def sort_grid(
@@ -25,6 +22,33 @@ def sort_grid(
         key and so on.
     """
 
+    def lexsort(sort_data):
+        """Return the same indices as np.lexsort for the given integer keys.
+
+        If all keys fit into a single 64 bit integer, they are packed into one key,
+        with the last key being the most significant one. Sorting this single key
+        is considerably faster than a lexicographic sort over multiple keys.
+        """
+
+        if sort_data.shape[1] > 0:
+            key_min = sort_data.min(axis=1)
+            key_max = sort_data.max(axis=1)
+            key_bits = [
+                (int(max_value) - int(min_value)).bit_length()
+                for min_value, max_value in zip(key_min, key_max)
+            ]
+            if sum(key_bits) <= 63:
+                packed_keys = np.zeros(sort_data.shape[1], dtype=np.int64)
+                shift = 0
+                for key_data, min_value, bits in zip(sort_data, key_min, key_bits):
+                    packed_keys |= (
+                        key_data.astype(np.int64) - np.int64(min_value)
+                    ) << shift
+                    shift += bits
+                return np.argsort(packed_keys, kind="stable")
+
+        return np.lexsort(sort_data)
+
     def get_sorting_indices(data, n_items, sorting_keys):
         """Get the indices that shall be used for sorting the data and the reverse
         sorting indices as well
@@ -38,14 +62,23 @@ def sort_grid(
             if isinstance(sorting_keys, str):
                 sorting_keys = [sorting_keys]
 
-            sort_data = np.zeros([len(sorting_keys), n_items], dtype=int)
             # Reverse the ordering of the keys, as this is required for lexsort
-            for i, key in enumerate(sorting_keys[::-1]):
-                sort_data[i, :] = np.array(data[key], dtype=int)
-            sort_indices = np.lexsort(sort_data)
-            sort_indices_reverse = np.array(range(len(sort_indices)))
-            for i, index in enumerate(sort_indices):
-                sort_indices_reverse[index] = i
+            key_data = [np.asarray(data[key]) for key in sorting_keys[::-1]]
+
+            # Keep the native data type if all keys are integers that fit into a 64
+            # bit signed integer, otherwise the keys are converted to int
+            sort_data_type = np.result_type(*key_data)
+            if not (
+                np.issubdtype(sort_data_type, np.integer)
+                and np.can_cast(sort_data_type, np.int64)
+            ):
+                sort_data_type = int
+            sort_data = np.zeros([len(sorting_keys), n_items], dtype=sort_data_type)
+            for i, data_values in enumerate(key_data):
+                sort_data[i, :] = data_values
+            sort_indices = lexsort(sort_data)
+            sort_indices_reverse = np.empty_like(sort_indices)
+            sort_indices_reverse[sort_indices] = np.arange(len(sort_indices))
             return True, sort_indices, sort_indices_reverse
 
     (
@@ -70,63 +103,72 @@ def sort_grid(
         else:
             return data[sorted_indices]
 
-    # Get the sorted connectivity array
-    cells = grid.cells
+    # Get the connectivity of all cells as a flat array and the offsets of the cells
+    # in that array
     cell_types = grid.celltypes
-
-    # Get the sorted cells with the sorted connectivity
+    connectivity = grid.cell_connectivity
+    cell_offsets = grid.offset
+    is_point_id = np.ones(len(connectivity), dtype=bool)
+
+    # Polyhedrons are described by their face stream, which also contains the number
+    # of faces and the number of points per face. The face streams of all polyhedrons
+    # are stored in the faces array of the grid, we walk over the faces of all
+    # polyhedrons at once to get the positions of the face sizes in that array.
+    polyhedron_ids = np.flatnonzero(cell_types == pv.CellType.POLYHEDRON)
+    if len(polyhedron_ids) > 0:
+        faces = vtk_numpy_support.vtk_to_numpy(grid.GetFaces())
+        face_stream_starts = vtk_numpy_support.vtk_to_numpy(grid.GetFaceLocations())[
+            polyhedron_ids
+        ]
+        faces_is_point_id = np.ones(len(faces), dtype=bool)
+        faces_is_point_id[face_stream_starts] = False
+        face_stream_ends = face_stream_starts + 1
+        n_faces_remaining = faces[face_stream_starts].copy()
+        while np.any(active := n_faces_remaining > 0):
+            face_size_positions = face_stream_ends[active]
+            faces_is_point_id[face_size_positions] = False
+            face_stream_ends[active] += faces[face_size_positions] + 1
+            n_faces_remaining[active] -= 1
+
+        # Replace the connectivity of the polyhedrons with their face streams
+        cell_starts = cell_offsets[:-1].copy()
+        cell_starts[polyhedron_ids] = len(connectivity) + face_stream_starts
+        cell_sizes = np.diff(cell_offsets)
+        cell_sizes[polyhedron_ids] = face_stream_ends - face_stream_starts
+        cell_offsets = np.concatenate([[0], np.cumsum(cell_sizes)])
+        gather_indices = np.repeat(
+            cell_starts - cell_offsets[:-1], cell_sizes
+        ) + np.arange(cell_offsets[-1])
+        connectivity = np.concatenate([connectivity, faces])[gather_indices]
+        is_point_id = np.concatenate([is_point_id, faces_is_point_id])[gather_indices]
+
+    # Use the sorted point ids in the connectivity
+    if sort_points:
+        connectivity = connectivity.copy()
+        connectivity[is_point_id] = sorted_indices_reverse_points[
+            connectivity[is_point_id]
+        ]
+
+    # Get the cell array in the legacy format, i.e., the number of entries of each
+    # cell followed by the entries.
+    cell_sizes = np.diff(cell_offsets)
+    cells_sorted = np.insert(connectivity, cell_offsets[:-1], cell_sizes)
+
+    # Get the sorted cells, i.e., gather the entries of each cell in the sorted order
+    if sort_cells:
+        cell_lengths = cell_sizes[sorted_indices_cells] + 1
+        cell_starts = cell_offsets[:-1] + np.arange(len(cell_sizes))
+        cell_starts_sorted = np.cumsum(cell_lengths) - cell_lengths
+        cells_sorted = cells_sorted[
+            np.repeat(
+                cell_starts[sorted_indices_cells] - cell_starts_sorted, cell_lengths
+            )
+            + np.arange(len(cells_sorted))
+        ]
+
+    # Get the sorted points and cell types
     points_sorted = sort_data(grid.points, sorted_indices_points)
     cell_types_sorted = sort_data(cell_types, sorted_indices_cells)
-    cells_sorted_list = [None] * grid.n_cells
-    index = 0
-    i_cell = 0
-    while index < len(cells):
-        if not cell_types[i_cell] == pv.CellType.POLYHEDRON:
-            n_indices = cells[index]
-            sorted_connectivity = np.zeros(n_indices, dtype=int)
-            for inner in range(n_indices):
-                index += 1
-                if sort_points:
-                    sorted_connectivity[inner] = sorted_indices_reverse_points[
-                        cells[index]
-                    ]
-                else:
-                    sorted_connectivity[inner] = cells[index]
-        else:
-            id_vtk_list = vtk.vtkIdList()
-            grid.GetFaceStream(i_cell, id_vtk_list)
-            id_list = vtk_id_to_list(id_vtk_list)
-            n_points = 0
-            inner = 1
-            sorted_connectivity = [id_list[0]]
-            n_faces = id_list[0]
-            for i_face in range(n_faces):
-                n_points = id_list[inner]
-                sorted_connectivity.append(n_points)
-                inner += 1
-                for i_point in range(n_points):
-                    if sort_points:
-                        sorted_connectivity.append(
-                            sorted_indices_reverse_points[id_list[inner]]
-                        )
-                    else:
-                        sorted_connectivity.append(id_list[inner])
-                    inner += 1
-                    n_points += 1
-            index += n_points
-        if sort_cells:
-            cells_sorted_list[
-                sorted_indices_reverse_cells[i_cell]
-            ] = sorted_connectivity
-        else:
-            cells_sorted_list[i_cell] = sorted_connectivity
-        index += 1
-        i_cell += 1
-    # Get the final cell connectivity array
-    cells_sorted = []
-    for cell in cells_sorted_list:
-        cells_sorted.append(len(cell))
-        cells_sorted.extend(cell)
 
     # Initialize the output structure
     grid_sorted = pv.UnstructuredGrid(cells_sorted, cell_types_sorted, points_sorted)
@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 """Interpolate between time steps in pvd time step series"""
 
-
 import numpy as np
 import pyvista as pv
 
@@ -27,15 +26,21 @@ def temporal_interpolator(
 
     time_values = np.array(pvd_collection.time_values)
 
+    # The time values are sorted, so we can directly get the first time step after
+    # the given time
+    end_index = int(np.searchsorted(time_values, time, side="right"))
+
     # Check if we hit the time step exactly
-    diff = time_values - time
-    abs_diff = np.abs(diff)
-    closest_time_step = np.argmin(abs_diff)
-    if abs_diff[closest_time_step] < tol:
-        return get_mesh(closest_time_step)
-
-    positive_indices = np.where(diff > 0)[0]
-    end_index = positive_indices[np.argmin(diff[positive_indices])]
+    for time_index in [end_index - 1, end_index]:
+        if 0 <= time_index < len(time_values):
+            if np.abs(time_values[time_index] - time) < tol:
+                return get_mesh(time_index)
+
+    if end_index == 0 or end_index == len(time_values):
+        raise ValueError(
+            f"The time {time} is outside of the time range "
+            f"[{time_values[0]}, {time_values[-1]}] of the pvd collection"
+        )
     start_index = end_index - 1
     start = time_values[start_index]
     end = time_values[end_index]
@@ -45,14 +50,27 @@ def temporal_interpolator(
     output_mesh = get_mesh(start_index)
     end_mesh = get_mesh(end_index)
 
-    output_mesh.points = factor[0] * output_mesh.points + factor[1] * end_mesh.points
-    for key in output_mesh.cell_data.keys():
-        output_mesh.cell_data[key] = (
-            factor[0] * output_mesh.cell_data[key] + factor[1] * end_mesh.cell_data[key]
-        )
-    for key in output_mesh.point_data.keys():
-        output_mesh.point_data[key] = (
-            factor[0] * output_mesh.point_data[key]
-            + factor[1] * end_mesh.point_data[key]
-        )
+    def blend(data_start, data_end):
+        """Interpolate the data in place, i.e., the result is stored in data_start.
+        The end mesh is only used for the interpolation, so its data is also scaled
+        in place. This avoids creating temporary arrays for each field."""
+        np.multiply(data_start, factor[0], out=data_start)
+        np.multiply(data_end, factor[1], out=data_end)
+        data_start += data_end
+
+    blend(output_mesh.points, end_mesh.points)
+    for data_start, data_end in [
+        (output_mesh.cell_data, end_mesh.cell_data),
+        (output_mesh.point_data, end_mesh.point_data),
+    ]:
+        for key in data_start.keys():
+            if np.issubdtype(data_start[key].dtype, np.floating) and np.issubdtype(
+                data_end[key].dtype, np.floating
+            ):
+                blend(data_start[key], data_end[key])
+            else:
+                # Integer data can not be interpolated in place
+                data_start[key] = (
+                    factor[0] * data_start[key] + factor[1] * data_end[key]
+                )
     return output_mesh
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""Fixtures shared between multiple test modules"""
+
+import os
+import pyvista
+import pytest
+
+from vtk_utils.merge_polylines import merge_polylines
+
+from . import TESTING_INPUT
+
+
+@pytest.fixture(scope="session")
+def helix_centerline():
+    """Return the merged centerline of the helix beam. This grid is shared between
+    all tests, so the tests must not modify it."""
+
+    grid = pyvista.read(os.path.join(TESTING_INPUT, "helix_beam.vtu"))
+    # The beam elements in the file do not share their nodes, so the duplicate points
+    # have to be merged. The merge map is not needed for the tests.
+    grid = grid.clean(produce_merge_map=False)
+    return pyvista.UnstructuredGrid(merge_polylines(grid))
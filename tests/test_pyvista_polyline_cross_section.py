@@ -1,37 +1,39 @@
 # -*- coding: utf-8 -*-
 """Test the functionality of polyline_cross_section"""
 
-
 import os
 import pyvista
 import pytest
 
 from vtk_utils.compare_grids import compare_grids
-from vtk_utils.merge_polylines import merge_polylines
 from pyvista_utils.polyline_cross_section import polyline_cross_section
 
 from . import TESTING_INPUT
 
 
+@pytest.fixture(scope="module")
+def helix_centerlines(helix_centerline):
+    """Create the centerline grid with two helices only once for all variants of
+    the test. The extrusion does not modify the input grid."""
+
+    grid_copy = helix_centerline.copy(deep=True)
+    grid_copy.points += [2, 0, 0]
+    return pyvista.merge([helix_centerline, grid_copy])
+
+
 @pytest.mark.parametrize(
     ["closed", "separate_surfaces"],
     [[False, False], [False, True], [True, False], [True, True]],
 )
-def test_pyvista_polyline_cross_section(request, closed, separate_surfaces):
+def test_pyvista_polyline_cross_section(
+    request, helix_centerlines, closed, separate_surfaces
+):
     """Test the polyline_cross_section function"""
 
-    # Load the helix centerline
-    grid = pyvista.get_reader(os.path.join(TESTING_INPUT, "helix_beam.vtu")).read()
-    grid = grid.clean()
-    grid = pyvista.UnstructuredGrid(merge_polylines(grid))
-    grid_copy = grid.copy(deep=True)
-    grid_copy.points += [2, 0, 0]
-    grid = pyvista.merge([grid, grid_copy])
-
     # Sweep a cross section along the helix
     cross_section_points = [[0, 0], [1, 0], [1, 1], [0, 1], [0.7, 0.3]]
     helix_3d = polyline_cross_section(
-        grid,
+        helix_centerlines,
         cross_section_points,
         closed=closed,
         separate_surfaces=separate_surfaces,
@@ -44,8 +46,6 @@ def test_pyvista_polyline_cross_section(request, closed, separate_surfaces):
         "separate" if separate_surfaces else "connected",
     )
     test_name = request.node.name.split("test_")[1].split("[")[0] + "_" + variant_name
-    helix_3d_reference = pyvista.get_reader(
-        os.path.join(TESTING_INPUT, test_name + ".vtu")
-    ).read()
+    helix_3d_reference = pyvista.read(os.path.join(TESTING_INPUT, test_name + ".vtu"))
     is_equal, output = compare_grids(helix_3d, helix_3d_reference, output=True)
     assert is_equal, output
@@ -4,6 +4,7 @@
 import os
 import numpy as np
 import pyvista
+import pytest
 
 from pyvista_utils.sort_grid import sort_grid
 from vtk_utils.compare_grids import compare_grids
@@ -11,30 +12,48 @@ from vtk_utils.compare_grids import compare_grids
 from . import TESTING_INPUT
 
 
-def test_pyvista_sort_grid_complete():
+@pytest.fixture(scope="module")
+def sort_grids():
+    """Read the serial and parallel grids only once for all tests in this module.
+    The tests have to copy the grids if they modify them.
+
+    Since each element writes it's own nodes, all tests sort the nodes of the
+    parallel grid by the cell id, so the cell data of the parallel grid is already
+    converted to point data here.
+    """
+    mesh_serial, mesh_parallel = [
+        pyvista.read(os.path.join(TESTING_INPUT, name))
+        for name in ["sort_serial.vtu", "sort_parallel.vtu"]
+    ]
+    mesh_parallel = mesh_parallel.cell_data_to_point_data(pass_cell_data=True)
+    return mesh_serial, mesh_parallel
+
+
+def test_pyvista_sort_grid_complete(sort_grids):
     """Test the sort grid function. This is done by comparing FEM grids that were
     generated with a different number of processors. In this test we completely
     sort the grid, i.e., we sort all points such that their ordering is completely
     defined by the sorting keys"""
 
-    mesh_serial, mesh_parallel = [
-        pyvista.get_reader(os.path.join(TESTING_INPUT, name)).read()
-        for name in ["sort_serial.vtu", "sort_parallel.vtu"]
-    ]
+    mesh_serial, mesh_parallel = [grid.copy(deep=True) for grid in sort_grids]
 
     # Since each element writes it's own nodes, we first sort the nodes by the cell id
     mesh_serial = mesh_serial.cell_data_to_point_data(pass_cell_data=True)
-    mesh_parallel = mesh_parallel.cell_data_to_point_data(pass_cell_data=True)
 
     # To make the sorting more challenging we split the cell and point IDs into individual
-    # fields representing the digits
-    parallel_node_gid = np.array(mesh_parallel.point_data["node_gid"], dtype=int)
-    mesh_parallel.point_data["node_gid_001"] = parallel_node_gid % 10
-    mesh_parallel.point_data["node_gid_010"] = parallel_node_gid % 100
-    mesh_parallel.point_data["node_gid_100"] = parallel_node_gid % 1000
-    parallel_cell_gid = np.array(mesh_parallel.cell_data["element_gid"], dtype=int)
-    mesh_parallel.cell_data["element_gid_01"] = parallel_cell_gid % 10
-    mesh_parallel.cell_data["element_gid_10"] = parallel_cell_gid % 100
+    # fields representing the digits. All digit fields are computed in a single pass.
+    parallel_node_gid = np.array(mesh_parallel.point_data["node_gid"], dtype=np.int32)
+    node_gid_digits = np.mod(
+        parallel_node_gid, np.array([[10], [100], [1000]], dtype=np.int32)
+    )
+    for name, digits in zip(
+        ["node_gid_001", "node_gid_010", "node_gid_100"], node_gid_digits
+    ):
+        mesh_parallel.point_data[name] = digits
+    parallel_cell_gid = np.array(mesh_parallel.cell_data["element_gid"], dtype=np.int32)
+    cell_gid_digits = np.mod(parallel_cell_gid, np.array([[10], [100]], dtype=np.int32))
+    for name, digits in zip(["element_gid_01", "element_gid_10"], cell_gid_digits):
+        mesh_parallel.cell_data[name] = digits
     mesh_parallel_sorted = sort_grid(
         mesh_parallel,
         sort_point_field=[
@@ -66,19 +85,13 @@ def test_pyvista_sort_grid_complete():
     assert compare[0], compare[1]
 
 
-def test_pyvista_sort_grid_partial():
+def test_pyvista_sort_grid_partial(sort_grids):
     """Test the sort grid function. This is done by comparing FEM grids that were
     generated with a different number of processors. In this test we completely
     only partially sort the grid, i.e., this tests how the original ordering
     is preserved after a sort."""
 
-    mesh_serial, mesh_parallel = [
-        pyvista.get_reader(os.path.join(TESTING_INPUT, name)).read()
-        for name in ["sort_serial.vtu", "sort_parallel.vtu"]
-    ]
-
-    # Since each element writes it's own nodes, we first sort the nodes by the cell id
-    mesh_parallel = mesh_parallel.cell_data_to_point_data(pass_cell_data=True)
+    mesh_serial, mesh_parallel = [grid.copy(deep=True) for grid in sort_grids]
 
     # Sort the parallel grid w.r.t. to the cell id
     mesh_parallel_sorted = sort_grid(
@@ -101,9 +114,9 @@ def test_pyvista_sort_grid_mixed_types():
     mesh_mixed_cells = pyvista.read(os.path.join(TESTING_INPUT, "mixed_cell_types.vtu"))
 
     # Sort the parallel grid
-    mesh_mixed_cells.point_data["sort_id"] = range(mesh_mixed_cells.number_of_points)[
-        ::-1
-    ]
+    mesh_mixed_cells.point_data["sort_id"] = np.arange(
+        mesh_mixed_cells.number_of_points - 1, -1, -1
+    )
     mesh_mixed_cells_sorted = sort_grid(mesh_mixed_cells, sort_point_field=["sort_id"])
 
     # Compare with the reference grid
@@ -114,3 +127,71 @@ def test_pyvista_sort_grid_mixed_types():
         mesh_mixed_cells_sorted, mesh_mixed_cells_reference, output=True
     )
     assert compare[0], compare[1]
+
+
+def test_pyvista_sort_grid_uint64():
+    """Test that the sort grid function can handle unsigned 64 bit sorting keys."""
+
+    mesh_mixed_cells = pyvista.read(os.path.join(TESTING_INPUT, "mixed_cell_types.vtu"))
+
+    # Sort the grid with an unsigned key, the reference also contains the signed key
+    mesh_mixed_cells.point_data["sort_id"] = np.arange(
+        mesh_mixed_cells.number_of_points - 1, -1, -1
+    )
+    mesh_mixed_cells.point_data["sort_id_uint64"] = np.array(
+        mesh_mixed_cells.point_data["sort_id"], dtype=np.uint64
+    )
+    mesh_mixed_cells_sorted = sort_grid(
+        mesh_mixed_cells, sort_point_field="sort_id_uint64"
+    )
+    del mesh_mixed_cells_sorted.point_data["sort_id_uint64"]
+
+    # Compare with the reference grid
+    mesh_mixed_cells_reference = pyvista.read(
+        os.path.join(TESTING_INPUT, "mixed_cell_types_sorted.vtu")
+    )
+    compare = compare_grids(
+        mesh_mixed_cells_sorted, mesh_mixed_cells_reference, output=True
+    )
+    assert compare[0], compare[1]
+
+
+@pytest.mark.parametrize(
+    "key_dtype,key_min,key_max,n_keys",
+    [
+        (np.int64, -(2**62), 2**62, 1),
+        (np.int64, 0, 2**40, 2),
+        (np.int16, -100, 100, 2),
+        (np.uint8, 0, 255, 2),
+        (np.uint64, 2**40, 2**40 + 10, 2),
+    ],
+)
+def test_pyvista_sort_grid_lexsort(sort_grids, key_dtype, key_min, key_max, n_keys):
+    """Test that the sorting gives the same ordering as np.lexsort, for different
+    integer types and for keys that can not be packed into a single integer."""
+
+    mesh = sort_grids[0].copy(deep=True)
+
+    # Add random keys and the original index of each item
+    rng = np.random.default_rng(seed=1)
+    keys = [f"key_{i_key}" for i_key in range(n_keys)]
+    for data, n_items in [
+        (mesh.point_data, mesh.number_of_points),
+        (mesh.cell_data, mesh.number_of_cells),
+    ]:
+        data["index"] = np.arange(n_items)
+        for key in keys:
+            data[key] = rng.integers(
+                key_min, key_max, n_items, dtype=key_dtype, endpoint=True
+            )
+
+    mesh_sorted = sort_grid(mesh, sort_point_field=keys, sort_cell_field=keys)
+
+    # The first key is the most significant one
+    for data, data_sorted in [
+        (mesh.point_data, mesh_sorted.point_data),
+        (mesh.cell_data, mesh_sorted.cell_data),
+    ]:
+        assert np.array_equal(
+            data_sorted["index"], np.lexsort([data[key] for key in keys[::-1]])
+        )
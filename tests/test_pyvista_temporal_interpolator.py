@@ -4,6 +4,7 @@
 
 import os
 import pyvista as pv
+import pytest
 
 from vtk_utils.compare_grids import compare_grids
 from pyvista_utils.temporal_interpolator import temporal_interpolator
@@ -20,18 +21,37 @@ def test_pyvista_temporal_interpolator():
 
     # Check if we can extract at a given time value
     mesh_01 = temporal_interpolator(pvd_reader, 1.0)
-    mesh_01_ref = pv.get_reader(
-        os.path.join(TESTING_INPUT, "temporal_interpolator_01.vtu")
-    ).read()
+    mesh_01_ref = pv.read(os.path.join(TESTING_INPUT, "temporal_interpolator_01.vtu"))
     is_equal, output = compare_grids(mesh_01, mesh_01_ref, output=True)
     assert is_equal, output
 
     # Check if we can interpolate between time steps
     mesh_interpolated = temporal_interpolator(pvd_reader, 2.0)
-    mesh_interpolated_ref = pv.get_reader(
+    mesh_interpolated_ref = pv.read(
         os.path.join(TESTING_INPUT, "temporal_interpolator_interpolated.vtu")
-    ).read()
+    )
     is_equal, output = compare_grids(
         mesh_interpolated, mesh_interpolated_ref, output=True
     )
     assert is_equal, output
+
+
+def test_pyvista_temporal_interpolator_bounds():
+    """Test the temporal_interpolator function at and outside of the time range"""
+
+    # Get the pvd reader
+    pvd_path = os.path.join(TESTING_INPUT, "temporal_interpolator.pvd")
+    pvd_reader = pv.get_reader(pvd_path)
+
+    # The first and the last time step can be extracted exactly
+    for time_index in [0, len(pvd_reader.time_values) - 1]:
+        mesh = temporal_interpolator(pvd_reader, pvd_reader.time_values[time_index])
+        pvd_reader.set_active_time_point(time_index)
+        mesh_ref = pvd_reader.read()[0]
+        is_equal, output = compare_grids(mesh, mesh_ref, output=True)
+        assert is_equal, output
+
+    # Times outside of the time range can not be interpolated
+    for time in [-1.0, 100.0]:
+        with pytest.raises(ValueError, match="outside of the time range"):
+            temporal_interpolator(pvd_reader, time)
@@ -13,14 +13,36 @@ from . import TESTING_INPUT
 def test_vtk_merge_polylines():
     """Test the merge_polylines function."""
 
-    grid = pyvista.get_reader(
-        os.path.join(TESTING_INPUT, "merge_polylines_raw.vtu")
-    ).read()
-    grid = grid.clean()
+    grid = pyvista.read(os.path.join(TESTING_INPUT, "merge_polylines_raw.vtu"))
+    grid = grid.clean(produce_merge_map=False)
     grid_merged = merge_polylines(grid)
-    grid_ref = pyvista.get_reader(
+    grid_ref = pyvista.read(
         os.path.join(TESTING_INPUT, "merge_polylines_reference.vtu")
-    ).read()
+    )
 
     compare = compare_grids(grid_merged, grid_ref, output=True)
     assert compare[0], compare[1]
+
+
+def test_vtk_merge_polylines_poly_data():
+    """Test the merge_polylines function with poly data as input."""
+
+    grid = pyvista.read(os.path.join(TESTING_INPUT, "merge_polylines_raw.vtu"))
+    grid = grid.clean(produce_merge_map=False)
+    poly_data = pyvista.PolyData(grid.points, lines=grid.cells)
+    poly_data.point_data.update(grid.point_data)
+    grid_merged = merge_polylines(poly_data)
+    grid_ref = pyvista.read(
+        os.path.join(TESTING_INPUT, "merge_polylines_reference.vtu")
+    )
+
+    compare = compare_grids(grid_merged, grid_ref, output=True)
+    assert compare[0], compare[1]
+
+
+def test_vtk_merge_polylines_empty():
+    """Test the merge_polylines function with an empty grid."""
+
+    grid_merged = merge_polylines(pyvista.UnstructuredGrid())
+    assert grid_merged.GetNumberOfPoints() == 0
+    assert grid_merged.GetNumberOfCells() == 0
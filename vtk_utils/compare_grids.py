@@ -61,12 +61,20 @@ def compare_grids(grid_1, grid_2, *, rtol=None, atol=None, output=False) -> bool
                 f"{name}: Data type does not match, got {t_1} and {t_2}",
             )
 
-        if not np.allclose(
-            vtk_numpy_support.vtk_to_numpy(array_1),
-            vtk_numpy_support.vtk_to_numpy(array_2),
-            rtol=rtol,
-            atol=atol,
-        ):
+        data_1 = vtk_numpy_support.vtk_to_numpy(array_1)
+        data_2 = vtk_numpy_support.vtk_to_numpy(array_2)
+        if np.issubdtype(data_1.dtype, np.integer):
+            # Integer data (e.g. cell types or connectivity) has to match exactly,
+            # there is no need to evaluate the tolerances.
+            values_match = np.array_equal(data_1, data_2)
+        else:
+            # Only evaluate the tolerances if the values are not exactly the same and
+            # if there actually is a tolerance.
+            values_match = np.array_equal(data_1, data_2) or (
+                (rtol > 0 or atol > 0)
+                and np.allclose(data_1, data_2, rtol=rtol, atol=atol)
+            )
+        if not values_match:
             return (
                 False,
                 f"{name}: Data values do not match",
@@ -74,39 +82,9 @@ def compare_grids(grid_1, grid_2, *, rtol=None, atol=None, output=False) -> bool
 
         return True, f"{name}: Compares OK"
 
-    return_value = True
-    lines = []
-
-    # Compare the point coordinates
-    compare_value, string = compare_arrays(
-        grid_1.GetPoints().GetData(),
-        grid_2.GetPoints().GetData(),
-        "point_coordinates",
-    )
-    return_value = compare_value and return_value
-    lines.append(string)
-
-    # Compare the cells
-    compare_value, string = compare_arrays(
-        grid_1.GetCellTypesArray(), grid_2.GetCellTypesArray(), "cell_types"
-    )
-    return_value = compare_value and return_value
-    lines.append(string)
-
-    compare_value, string = compare_arrays(
-        grid_1.GetCells().GetData(), grid_2.GetCells().GetData(), "cell_connectivity"
-    )
-    return_value = compare_value and return_value
-    lines.append(string)
-
-    compare_value, string = compare_arrays(
-        grid_1.GetFaces(), grid_2.GetFaces(), "face_connectivity"
-    )
-    return_value = compare_value and return_value
-    lines.append(string)
-
     def compare_data_fields(data_1, data_2, name):
-        """Compare multiple data sets grouped together"""
+        """Compare multiple data sets grouped together, the result of each comparison
+        is yielded"""
 
         names_1, names_2 = [
             set([data.GetArrayName(i) for i in range(data.GetNumberOfArrays())])
@@ -114,43 +92,63 @@ def compare_grids(grid_1, grid_2, *, rtol=None, atol=None, output=False) -> bool
         ]
 
         if not names_1 == names_2:
-            return (
+            yield (
                 False,
-                [f"{name}: Data fields do not match, got {names_1} and {names_2}"],
+                f"{name}: Data fields do not match, got {names_1} and {names_2}",
             )
+            return
 
         if len(names_1) == 0:
-            return True, [f"{name}: OK (empty)"]
+            yield True, f"{name}: OK (empty)"
+            return
 
-        lines = []
-        return_value = True
         for field_name in names_1:
-            compare_value, string = compare_arrays(
+            yield compare_arrays(
                 data_1.GetArray(field_name),
                 data_2.GetArray(field_name),
                 f"{name}::{field_name}",
             )
-            return_value = compare_value and return_value
-            lines.append(string)
 
-        return return_value, lines
+    def get_comparisons():
+        """Yield the results of all comparisons between the grids"""
+
+        # Compare the point coordinates
+        yield compare_arrays(
+            grid_1.GetPoints().GetData(),
+            grid_2.GetPoints().GetData(),
+            "point_coordinates",
+        )
+
+        # Compare the cells
+        yield compare_arrays(
+            grid_1.GetCellTypesArray(), grid_2.GetCellTypesArray(), "cell_types"
+        )
+        yield compare_arrays(
+            grid_1.GetCells().GetData(),
+            grid_2.GetCells().GetData(),
+            "cell_connectivity",
+        )
+        yield compare_arrays(grid_1.GetFaces(), grid_2.GetFaces(), "face_connectivity")
+
+        # Compare actual data
+        yield from compare_data_fields(
+            grid_1.GetFieldData(), grid_2.GetFieldData(), "field_data"
+        )
+        yield from compare_data_fields(
+            grid_1.GetCellData(), grid_2.GetCellData(), "cell_data"
+        )
+        yield from compare_data_fields(
+            grid_1.GetPointData(), grid_2.GetPointData(), "point_data"
+        )
 
-    # Compare actual data
-    compare_value, strings = compare_data_fields(
-        grid_1.GetFieldData(), grid_2.GetFieldData(), "field_data"
-    )
-    return_value = compare_value and return_value
-    lines.extend(strings)
-    compare_value, strings = compare_data_fields(
-        grid_1.GetCellData(), grid_2.GetCellData(), "cell_data"
-    )
-    return_value = compare_value and return_value
-    lines.extend(strings)
-    compare_value, strings = compare_data_fields(
-        grid_1.GetPointData(), grid_2.GetPointData(), "point_data"
-    )
-    return_value = compare_value and return_value
-    lines.extend(strings)
+    return_value = True
+    lines = []
+    for compare_value, string in get_comparisons():
+        return_value = compare_value and return_value
+        lines.append(string)
+        if not (return_value or output):
+            # Only the result is requested, so we can stop at the first mismatch
+            return False
 
     if output:
         return return_value, lines
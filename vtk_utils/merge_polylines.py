@@ -1,13 +1,18 @@
 # -*- coding: utf-8 -*-
 """Merge lines or polylines with each other that represent a continuous curve"""
 
-
 # Import python modules.
+from collections import deque
+
 import numpy as np
 import vtk
 
 # Import local stuff
-from .vtk_data_structures_utils import vtk_id_to_list
+from .vtk_data_structures_utils import (
+    set_vtk_cells,
+    vtk_cell_array_to_arrays,
+    vtk_points_to_array,
+)
 
 
 def merge_polylines(
@@ -36,70 +41,111 @@ def merge_polylines(
         output_grid = vtk.vtkUnstructuredGrid()
     output_grid.Initialize()
 
-    # Add the points (and the point data) to the output.
+    # Add the points (and the point data) to the output, the arrays are shared with
+    # the input grid.
     output_grid.SetPoints(grid.GetPoints())
-    for i in range(grid.GetPointData().GetNumberOfArrays()):
-        output_grid.GetPointData().AddArray(grid.GetPointData().GetArray(i))
+    output_grid.GetPointData().ShallowCopy(grid.GetPointData())
 
-    # Check that all cells are lines or polylines.
+    # Check that all cells are lines or polylines, it is enough to look at the
+    # distinct cell types in the grid. Only if an unsupported type is found, we look
+    # for the first cell with that type to report it.
     n_cells = grid.GetNumberOfCells()
-    for i in range(n_cells):
-        cell = grid.GetCell(i)
-        if not (isinstance(cell, vtk.vtkLine) or isinstance(cell, vtk.vtkPolyLine)):
+    cell_types = vtk.vtkCellTypes()
+    grid.GetCellTypes(cell_types)
+    for i_type in range(cell_types.GetNumberOfTypes()):
+        if cell_types.GetCellType(i_type) not in [vtk.VTK_LINE, vtk.VTK_POLY_LINE]:
+            i = next(
+                i
+                for i in range(n_cells)
+                if grid.GetCellType(i) not in [vtk.VTK_LINE, vtk.VTK_POLY_LINE]
+            )
             raise ValueError(
                 "Only lines (vtk type 3) and poly lines (vtk type 4) are supported. Got {} (vtk type {})".format(
-                    type(cell), grid.GetCellType(i)
+                    type(grid.GetCell(i)), grid.GetCellType(i)
                 )
             )
 
-    def get_angle_between_lines(tangent_at_point, point_id, cell_id):
-        """Get the dot product of the tangents at the connection point between connecting cells"""
+    # Get the connectivity of all cells as flat arrays, so we don't have to create a
+    # vtk cell object each time we need the point ids of a cell. Poly data stores the
+    # lines in the lines array.
+    if isinstance(grid, vtk.vtkPolyData):
+        cell_array = grid.GetLines()
+    else:
+        cell_array = grid.GetCells()
+    connectivity, cell_offsets = vtk_cell_array_to_arrays(cell_array)
 
-        cell_point_ids = vtk_id_to_list(grid.GetCell(cell_id).GetPointIds())
-        if cell_point_ids[-1] == point_id:
-            cell_tangent_point_indices = [-2, -1]
-        elif cell_point_ids[0] == point_id:
-            cell_tangent_point_indices = [1, 0]
-        else:
-            raise ValueError("Given point index does not match the connectivity array")
-        points_for_tangent = [
-            np.array(grid.GetPoint(cell_point_ids[index]))
-            for index in cell_tangent_point_indices
+    def get_cell_point_ids(cell_id):
+        """Return the point ids of a cell as a list"""
+        return connectivity[cell_offsets[cell_id] : cell_offsets[cell_id + 1]].tolist()
+
+    # Build the inverse connectivity, i.e., the cells connected to each point, in a
+    # compressed row format. This gives the same result as grid.GetPointCells.
+    connectivity_cell_ids = np.repeat(np.arange(n_cells), np.diff(cell_offsets))
+    connectivity_sort_indices = np.argsort(connectivity, kind="stable")
+    point_cells = connectivity_cell_ids[connectivity_sort_indices]
+    point_cells_offsets = np.zeros(grid.GetNumberOfPoints() + 1, dtype=int)
+    np.cumsum(
+        np.bincount(connectivity, minlength=grid.GetNumberOfPoints()),
+        out=point_cells_offsets[1:],
+    )
+
+    def get_point_cell_ids(point_id):
+        """Return the ids of all cells connected to a point as an array"""
+        return point_cells[
+            point_cells_offsets[point_id] : point_cells_offsets[point_id + 1]
         ]
-        cell_tangent = points_for_tangent[1] - points_for_tangent[0]
-        cell_tangent = cell_tangent / np.linalg.norm(cell_tangent)
+
+    points = vtk_points_to_array(grid)
+
+    # The smooth angle is the angle between two successive segments, i.e., a straight
+    # continuation has an angle of pi. The smoothness check compares the outward
+    # tangent of the poly line with the tangent of the next cell pointing away from
+    # the connection point, so the angle between these two tangents must not exceed
+    # pi - smooth_angle. The cosine of that angle is -cos(smooth_angle).
+    cos_max_tangent_angle = -np.cos(smooth_angle)
+
+    # Get the unit tangents at both ends of all cells, pointing away from the end
+    # points, i.e., in the direction a poly line continues into this cell.
+    cell_end_point_ids = np.stack(
+        [connectivity[cell_offsets[:-1]], connectivity[cell_offsets[1:] - 1]], axis=1
+    )
+    cell_inner_point_ids = np.stack(
+        [connectivity[cell_offsets[:-1] + 1], connectivity[cell_offsets[1:] - 2]],
+        axis=1,
+    )
+    cell_tangents = points[cell_inner_point_ids] - points[cell_end_point_ids]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cell_tangents /= np.linalg.norm(cell_tangents, axis=-1, keepdims=True)
+
+    def get_angles_between_lines(tangent_at_point, point_id, cell_ids):
+        """Get the cosines of the angles between the tangent at the connection point
+        and the connecting cells, for all given cells at once"""
+
+        is_cell_end = cell_end_point_ids[cell_ids, 1] == point_id
+        is_cell_start = cell_end_point_ids[cell_ids, 0] == point_id
+        if not np.all(is_cell_end | is_cell_start):
+            raise ValueError("Given point index does not match the connectivity array")
+        cell_tangents_at_point = np.where(
+            is_cell_end[:, np.newaxis],
+            cell_tangents[cell_ids, 1],
+            cell_tangents[cell_ids, 0],
+        )
 
         # Get the angle between the two
-        return np.dot(tangent_at_point, cell_tangent)
+        return cell_tangents_at_point @ tangent_at_point
 
-    def find_next_connected_polyline(grid, old_cell_tracker):
-        """Start with the first old cell that was not found yet. Then search all cells
+    def find_connected_polyline(next_cell_id, cell_available):
+        """Start with the given old cell that was not found yet. Then search all cells
         connected to that one.
 
         Return all point ids that make up the new poly line.
-        Return None if all cells have been found.
         """
 
-        # Take the next available cell and look for all connected cells
-        for i in old_cell_tracker:
-            if i is not None:
-                next_cell_id = i
-                break
-        else:
-            return None
-
-        def add_next_cell(connected_cell_points, old_cell_tracker, connected_point_id):
+        def add_next_cell(connected_cell_points, cell_available, connected_point_id):
             """Start at the initial point and loop over lines as long as a connectivity is found"""
-            id_list = vtk.vtkIdList()
-            grid.GetPointCells(connected_point_id, id_list)
-            cell_connectivity = vtk_id_to_list(id_list)
-            possible_next_cell_ids = [
-                cell_id
-                for cell_id in cell_connectivity
-                if old_cell_tracker[cell_id] is not None
-            ]
+            cell_connectivity = get_point_cell_ids(connected_point_id)
 
-            if len(possible_next_cell_ids) == 0:
+            if not np.any(cell_available[cell_connectivity]):
                 # In this case we are at the end of the poly line
                 return connected_cell_points, None
 
@@ -112,68 +158,75 @@ def merge_polylines(
                 raise ValueError(
                     "Given point index does not match the connectivity array"
                 )
-            points_for_tangent = [
-                np.array(grid.GetPoint(connected_cell_points[index]))
-                for index in tangent_point_indices
+            points_for_tangent = points[
+                [connected_cell_points[index] for index in tangent_point_indices]
             ]
             tangent = points_for_tangent[1] - points_for_tangent[0]
             tangent = tangent / np.linalg.norm(tangent)
 
             # Check the angle between this line and all connected cells
-            smooth_connected_cells = []
-            for cell_id in cell_connectivity:
-                dot = get_angle_between_lines(tangent, connected_point_id, cell_id)
-                if np.cos(smooth_angle) > dot:
-                    smooth_connected_cells.append(cell_id)
+            smooth_connected_cells = cell_connectivity[
+                get_angles_between_lines(tangent, connected_point_id, cell_connectivity)
+                > cos_max_tangent_angle
+            ]
 
             if len(smooth_connected_cells) == 0 or len(smooth_connected_cells) > 1:
                 # In this case there are either no or multiple lines connected which are
                 # smooth to the given one. There is no unique way to continue this, so we
                 # stop here.
                 return connected_cell_points, None
-            elif old_cell_tracker[smooth_connected_cells[0]] is None:
+            elif not cell_available[smooth_connected_cells[0]]:
                 # The smooth connected cell is already accounted for in the new cells
                 return connected_cell_points, None
             else:
                 # We want to continue along the found smooth cell
                 new_cell_id = smooth_connected_cells[0]
 
-            # Add the new cell and its points (in correct order).
-            new_cell_point_ids = vtk_id_to_list(grid.GetCell(new_cell_id).GetPointIds())
-            if new_cell_point_ids[0] == connected_cell_points[-1]:
+            # Add the new cell and its points (in correct order). The points are a
+            # view of the connectivity array, so reversing them does not copy any data.
+            new_cell_point_ids = connectivity[
+                cell_offsets[new_cell_id] : cell_offsets[new_cell_id + 1]
+            ]
+            new_cell_start_id, new_cell_end_id = cell_end_point_ids[new_cell_id]
+            if new_cell_start_id == connected_cell_points[-1]:
                 # First point of this cell is added to the last point of the last
                 # cell.
                 extend = True
-            elif new_cell_point_ids[-1] == connected_cell_points[-1]:
+                reverse = False
+            elif new_cell_end_id == connected_cell_points[-1]:
                 # Last point of this cell is added to the last point of the last
                 # cell.
                 extend = True
-                new_cell_point_ids.reverse()
-            elif new_cell_point_ids[0] == connected_cell_points[0]:
+                reverse = True
+            elif new_cell_start_id == connected_cell_points[0]:
                 # First point of this cell is added to the first point of the last
                 # cell.
                 extend = False
-                new_cell_point_ids.reverse()
-            elif new_cell_point_ids[-1] == connected_cell_points[0]:
+                reverse = True
+            elif new_cell_end_id == connected_cell_points[0]:
                 # Last point of this cell is added to the first point of the last
                 # cell.
                 extend = False
+                reverse = False
             else:
                 raise ValueError("This should not happen")
+            if reverse:
+                new_cell_point_ids = new_cell_point_ids[::-1]
 
             # Extend the merged poly line points
             if extend:
-                connected_cell_points.extend(new_cell_point_ids[1:])
-                next_start_index = -1
+                connected_cell_points.extend(new_cell_point_ids[1:].tolist())
+                next_point_id = new_cell_point_ids[-1]
             else:
-                connected_cell_points = new_cell_point_ids[:-1] + connected_cell_points
-                next_start_index = 0
+                connected_cell_points.extendleft(new_cell_point_ids[-2::-1].tolist())
+                next_point_id = new_cell_point_ids[0]
 
-            old_cell_tracker[new_cell_id] = None
-            return connected_cell_points, new_cell_point_ids[next_start_index]
+            cell_available[new_cell_id] = False
+            return connected_cell_points, next_point_id
 
-        old_cell_tracker[next_cell_id] = None
-        connected_cell_points = vtk_id_to_list(grid.GetCell(next_cell_id).GetPointIds())
+        cell_available[next_cell_id] = False
+        # The poly line can grow at both ends, so we store the points in a deque
+        connected_cell_points = deque(get_cell_point_ids(next_cell_id))
         start_id = connected_cell_points[0]
         end_id = connected_cell_points[-1]
 
@@ -181,32 +234,33 @@ def merge_polylines(
             next_point_id = start_index
             while next_point_id is not None:
                 connected_cell_points, next_point_id = add_next_cell(
-                    connected_cell_points, old_cell_tracker, next_point_id
+                    connected_cell_points, cell_available, next_point_id
                 )
 
-        return connected_cell_points
+        return list(connected_cell_points)
 
     # Start with the first cell and search all cells connected to that cell and so on.
-    # Then do the same with the first cell that was not found and so on.
-    old_cell_tracker = list(range(n_cells))
+    # Then do the same with the first cell that was not found and so on. All cells
+    # before next_cell_id are already found, so they don't have to be checked again.
+    cell_available = np.ones(n_cells, dtype=bool)
+    next_cell_id = 0
     new_cells = []
-    while True:
-        connected_cell_point_ids = find_next_connected_polyline(grid, old_cell_tracker)
-
-        if connected_cell_point_ids is None:
+    while next_cell_id < n_cells:
+        next_cell_id += np.argmax(cell_available[next_cell_id:])
+        if not cell_available[next_cell_id]:
             break
-        else:
-            # Create the found poly line
-            new_cell = vtk.vtkPolyLine()
-            new_cell.GetPointIds().SetNumberOfIds(len(connected_cell_point_ids))
-            for i, index in enumerate(connected_cell_point_ids):
-                new_cell.GetPointIds().SetId(i, index)
-            new_cells.append(new_cell)
-
-    # Add all new cells to the output data
-    output_grid.Allocate(len(new_cells), 1)
-    for cell in new_cells:
-        output_grid.InsertNextCell(cell.GetCellType(), cell.GetPointIds())
+        new_cells.append(find_connected_polyline(next_cell_id, cell_available))
+
+    # Add all new poly lines to the output data at once
+    new_cell_sizes = [len(cell_point_ids) for cell_point_ids in new_cells]
+    new_cell_offsets = np.concatenate([[0], np.cumsum(new_cell_sizes, dtype=int)])
+    new_cell_connectivity = np.fromiter(
+        (point_id for cell_point_ids in new_cells for point_id in cell_point_ids),
+        dtype=int,
+        count=new_cell_offsets[-1],
+    )
+    new_cell_types = np.full(len(new_cells), vtk.VTK_POLY_LINE, dtype=np.uint8)
+    set_vtk_cells(output_grid, new_cell_types, new_cell_offsets, new_cell_connectivity)
 
     if not output_grid_given:
         return output_grid
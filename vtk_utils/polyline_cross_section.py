@@ -7,7 +7,11 @@ import vtk
 from vtk.util import numpy_support as vtk_numpy_support
 
 # Import local stuff
-from .vtk_data_structures_utils import vtk_id_to_list
+from .vtk_data_structures_utils import (
+    arrays_to_vtk_cell_array,
+    vtk_cell_array_to_arrays,
+    vtk_points_to_array,
+)
 
 
 def polyline_cross_section(
@@ -31,11 +35,23 @@ def polyline_cross_section(
     # Get number of cross-section points
     n_cross_section_points = len(cross_section_points)
 
-    # Check that all cells are poly lines.
-    for i in range(n_cells):
-        if not grid.GetCellType(i) == 4:
+    # Check that all cells are poly lines, it is enough to look at the distinct cell
+    # types in the grid.
+    cell_types = vtk.vtkCellTypes()
+    grid.GetCellTypes(cell_types)
+    for i_type in range(cell_types.GetNumberOfTypes()):
+        if not cell_types.GetCellType(i_type) == vtk.VTK_POLY_LINE:
             raise ValueError("Only poly lines (vtk type 4) are supported")
 
+    # Get the connectivity of all cells as flat arrays, so we don't have to create a
+    # vtk cell object for each poly line. Poly data stores the poly lines in the lines
+    # array.
+    if isinstance(grid, vtk.vtkPolyData):
+        cell_array = grid.GetLines()
+    else:
+        cell_array = grid.GetCells()
+    connectivity, cell_offsets = vtk_cell_array_to_arrays(cell_array)
+
     # Data arrays
     point_data_input = grid.GetPointData()
     base_vector_data = [None] * 3
@@ -52,116 +68,149 @@ def polyline_cross_section(
                 point_data_input.GetArray(i_point_data)
             )
 
-    # New points
-    new_point_coordinates = vtk.vtkPoints()
-    new_point_data = {}
-    for data_name in point_data.keys():
-        if point_data[data_name].ndim == 1:
-            n_components = 1
-        else:
-            n_components = point_data[data_name].shape[1]
-        new_point_data[data_name] = vtk.vtkDoubleArray()
-        new_point_data[data_name].SetName(data_name)
-        new_point_data[data_name].SetNumberOfComponents(n_components)
-    new_polygons = []
-    new_quad4 = []
-
-    def extrude_cross_section_polyline(polyline: vtk.vtkPolyLine):
-        """Extrude the cross section along the given polyline"""
-
-        i_start = new_point_coordinates.GetNumberOfPoints()
-
-        point_ids = vtk_id_to_list(polyline.GetPointIds())
-        for i_point_centerline, point_centerline_id in enumerate(point_ids):
-            i_start_inner = new_point_coordinates.GetNumberOfPoints()
-
-            coordinates = np.array(grid.GetPoint(point_centerline_id))
-            base_vectors = [
-                base_vector_data[i_dir][point_centerline_id] for i_dir in range(3)
-            ]
-            for i_cross_section_point, cross_section_point in enumerate(
-                cross_section_points
-            ):
-                new_coordinate = (
-                    coordinates
-                    + cross_section_point[0] * base_vectors[1]
-                    + cross_section_point[1] * base_vectors[2]
-                )
-                new_point_coordinates.InsertNextPoint(new_coordinate)
-
-                # Set the point data
-                for data_name in new_point_data.keys():
-                    n_components = new_point_data[data_name].GetNumberOfComponents()
-                    if n_components == 1:
-                        new_point_data[data_name].InsertNextValue(
-                            point_data[data_name][point_centerline_id]
-                        )
-                    else:
-                        for value in point_data[data_name][point_centerline_id]:
-                            new_point_data[data_name].InsertNextValue(value)
-
-                # Set the quad4 cells
-                is_start_centerline = i_point_centerline == 0
-                is_last_cross_section = (
-                    n_cross_section_points - 1 == i_cross_section_point
-                )
-                if (not is_start_centerline) and not (
-                    is_last_cross_section and not closed
-                ):
-                    new_cell = vtk.vtkQuad()
-                    new_cell.GetPointIds().SetNumberOfIds(4)
-                    new_cell.GetPointIds().SetId(
-                        0,
-                        i_start_inner - n_cross_section_points + i_cross_section_point,
-                    )
-                    new_cell.GetPointIds().SetId(
-                        1, i_start_inner + i_cross_section_point
-                    )
-                    if i_cross_section_point == n_cross_section_points - 1:
-                        i_cross_section_point = -1
-                    new_cell.GetPointIds().SetId(
-                        2, i_start_inner + i_cross_section_point + 1
-                    )
-                    new_cell.GetPointIds().SetId(
-                        3,
-                        i_start_inner
-                        - n_cross_section_points
-                        + i_cross_section_point
-                        + 1,
-                    )
-                    new_quad4.append(new_cell)
-
-        i_end = new_point_coordinates.GetNumberOfPoints() - 1
+    points = vtk_points_to_array(grid)
+
+    # Only the second and third base vectors span the cross section plane. Store them
+    # in a single array, so they can be gathered at once for each polyline. A grid
+    # without base vectors (e.g. an empty grid) has nothing to gather.
+    cross_section_base_vectors = np.stack(
+        [np.zeros((0, 3)) if data is None else data for data in base_vector_data[1:]],
+        axis=1,
+    )
+
+    # The in-plane offsets are scaled with the base vectors, so use their data type
+    # to get the same results as for a scalar multiplication.
+    cross_section_points = np.asarray(
+        cross_section_points, dtype=cross_section_base_vectors.dtype
+    )
+
+    # New points, for each new point we also store the centerline point it was
+    # created from, to get the point data.
+    new_point_coordinates = []
+    new_point_centerline_ids = [np.zeros(0, dtype=int)]
+    n_new_points = 0
+    new_polygons = [np.zeros((0, n_cross_section_points), dtype=int)]
+    new_quad4 = [np.zeros((0, 4), dtype=int)]
+
+    # Index of each cross-section point and the one following it along the profile
+    if closed:
+        i_cross_section = np.arange(n_cross_section_points)
+    else:
+        i_cross_section = np.arange(n_cross_section_points - 1)
+    i_cross_section_next = (i_cross_section + 1) % n_cross_section_points
+
+    def extrude_cross_section_polyline(point_ids, i_start):
+        """Extrude the cross section along the polyline with the given point ids, the
+        new points start at the index i_start.
+
+        Return the number of created points.
+        """
+
+        n_points_centerline = len(point_ids)
+
+        # Get the coordinates of all new points along this polyline, the cross
+        # section points are the inner dimension.
+        base_vectors = cross_section_base_vectors[point_ids, np.newaxis]
+        new_coordinates = (
+            points[point_ids, np.newaxis, :]
+            + cross_section_points[np.newaxis, :, 0, np.newaxis]
+            * base_vectors[..., 0, :]
+            + cross_section_points[np.newaxis, :, 1, np.newaxis]
+            * base_vectors[..., 1, :]
+        ).reshape(-1, 3)
+        new_point_coordinates.append(new_coordinates)
+
+        new_point_centerline_ids.append(np.repeat(point_ids, n_cross_section_points))
+
+        # Set the quad4 cells between each pair of successive cross sections
+        i_start_inner = (
+            i_start
+            + np.arange(1, n_points_centerline)[:, np.newaxis] * n_cross_section_points
+        )
+        i_start_previous = i_start_inner - n_cross_section_points
+        new_quad4.append(
+            np.stack(
+                [
+                    i_start_previous + i_cross_section,
+                    i_start_inner + i_cross_section,
+                    i_start_inner + i_cross_section_next,
+                    i_start_previous + i_cross_section_next,
+                ],
+                axis=-1,
+            ).reshape(-1, 4)
+        )
+
+        i_end = i_start + len(new_coordinates) - 1
 
         # Set the front and end polygon
         if closed:
-            for index, reverse in [[i_start, False], [i_end, True]]:
-                new_cell = vtk.vtkPolygon()
-                new_cell.GetPointIds().SetNumberOfIds(n_cross_section_points)
-                for i_point_polygon in range(n_cross_section_points):
-                    if not reverse:
-                        new_cell.GetPointIds().SetId(
-                            n_cross_section_points - i_point_polygon - 1,
-                            index + i_point_polygon,
-                        )
-                    else:
-                        new_cell.GetPointIds().SetId(
-                            i_point_polygon, index - i_point_polygon
-                        )
-                new_polygons.append(new_cell)
+            i_polygon = np.arange(n_cross_section_points)
+            new_polygons.append(
+                np.stack([i_start + i_polygon[::-1], i_end - i_polygon])
+            )
+
+        return len(new_coordinates)
 
     # Create the new data for each polyline
     for i_cell in range(n_cells):
-        extrude_cross_section_polyline(grid.GetCell(i_cell))
+        n_new_points += extrude_cross_section_polyline(
+            connectivity[cell_offsets[i_cell] : cell_offsets[i_cell + 1]],
+            n_new_points,
+        )
 
-    # Add the new points and cells
+    # Add the new points, vtkPoints are stored in single precision per default.
     output_grid = vtk.vtkPolyData()
     output_grid.Initialize()
-    output_grid.SetPoints(new_point_coordinates)
-    for name in new_point_data.keys():
-        output_grid.GetPointData().AddArray(new_point_data[name])
-    output_grid.Allocate(len(new_polygons) + len(new_quad4), 1)
-    for cell in new_polygons + new_quad4:
-        output_grid.InsertNextCell(cell.GetCellType(), cell.GetPointIds())
+    output_points = vtk.vtkPoints()
+    output_points.SetData(
+        vtk_numpy_support.numpy_to_vtk(
+            np.concatenate(
+                [np.zeros((0, 3))] + new_point_coordinates, dtype=np.float32
+            ),
+            deep=True,
+        )
+    )
+    output_grid.SetPoints(output_points)
+
+    # Add the point data, the values of each centerline point are copied to all
+    # points created from it.
+    new_point_centerline_ids = np.concatenate(new_point_centerline_ids)
+    for name, data in point_data.items():
+        new_point_data = vtk_numpy_support.numpy_to_vtk(
+            np.asarray(data[new_point_centerline_ids], dtype=float), deep=True
+        )
+        new_point_data.SetName(name)
+        output_grid.GetPointData().AddArray(new_point_data)
+
+    # Add the cells
+    new_polygons = np.concatenate(new_polygons)
+    new_quad4 = np.concatenate(new_quad4)
+    cell_types = np.concatenate(
+        [
+            np.full(len(new_polygons), vtk.VTK_POLYGON, dtype=np.uint8),
+            np.full(len(new_quad4), vtk.VTK_QUAD, dtype=np.uint8),
+        ]
+    )
+    cell_sizes = np.concatenate(
+        [
+            np.full(len(new_polygons), n_cross_section_points),
+            np.full(len(new_quad4), 4),
+        ]
+    )
+    cell_offsets = np.concatenate([[0], np.cumsum(cell_sizes)])
+    cell_connectivity = np.concatenate([new_polygons.flatten(), new_quad4.flatten()])
+    if closed and n_cross_section_points <= 4:
+        # Poly data derives the type of the cells in the polys array from their
+        # number of points, i.e., the end polygons would become triangles or quads.
+        # Therefore, the cells are inserted one by one with their explicit type.
+        output_grid.Allocate(len(cell_types), 1)
+        for cell_type, point_ids in zip(
+            cell_types, np.split(cell_connectivity, cell_offsets[1:-1])
+        ):
+            output_grid.InsertNextCell(int(cell_type), len(point_ids), point_ids)
+    else:
+        # The cell types can be derived from the number of points, so all cells can
+        # be added at once.
+        output_grid.SetPolys(arrays_to_vtk_cell_array(cell_offsets, cell_connectivity))
 
     return output_grid
@@ -1,9 +1,70 @@
 # -*- coding: utf-8 -*-
 """Utility functions for vtk data structures"""
 
+# Import python modules.
+import numpy as np
+import vtk
+from vtk.util import numpy_support as vtk_numpy_support
+
 
 def vtk_id_to_list(vtk_id_list):
     """Convert a vtk id list to a python list"""
     return [
         int(vtk_id_list.GetId(i_id)) for i_id in range(vtk_id_list.GetNumberOfIds())
     ]
+
+
+def vtk_cell_array_to_arrays(vtk_cell_array):
+    """Return the connectivity and the offsets of a vtk cell array as numpy arrays
+
+    The point ids of the cell i are connectivity[offsets[i] : offsets[i + 1]]. The
+    arrays are views of the vtk data and are not copied.
+    """
+    connectivity = vtk_numpy_support.vtk_to_numpy(vtk_cell_array.GetConnectivityArray())
+    offsets = vtk_numpy_support.vtk_to_numpy(vtk_cell_array.GetOffsetsArray())
+    return connectivity, offsets
+
+
+def vtk_points_to_array(grid):
+    """Return the point coordinates of a grid as a numpy array of double values, the
+    same values as returned by GetPoint"""
+    if grid.GetPoints() is None:
+        return np.zeros((0, 3))
+    return np.asarray(
+        vtk_numpy_support.vtk_to_numpy(grid.GetPoints().GetData()), dtype=float
+    )
+
+
+def arrays_to_vtk_cell_array(offsets, connectivity):
+    """Create a vtk cell array from the offsets and the connectivity of the cells
+
+    The point ids of the cell i are connectivity[offsets[i] : offsets[i + 1]].
+    """
+    cells = vtk.vtkCellArray()
+    cells.SetData(
+        vtk_numpy_support.numpy_to_vtk(offsets, deep=True, array_type=vtk.VTK_ID_TYPE),
+        vtk_numpy_support.numpy_to_vtk(
+            connectivity, deep=True, array_type=vtk.VTK_ID_TYPE
+        ),
+    )
+    return cells
+
+
+def set_vtk_cells(grid, cell_types, offsets, connectivity):
+    """Set all cells of an unstructured grid at once
+
+    Args
+    ----
+    grid: vtk.vtkUnstructuredGrid
+        Grid the cells are set for, existing cells are replaced
+    cell_types:
+        vtk type of each cell
+    offsets / connectivity:
+        The point ids of the cell i are connectivity[offsets[i] : offsets[i + 1]]
+    """
+    grid.SetCells(
+        vtk_numpy_support.numpy_to_vtk(
+            cell_types, deep=True, array_type=vtk.VTK_UNSIGNED_CHAR
+        ),
+        arrays_to_vtk_cell_array(offsets, connectivity),
+    )